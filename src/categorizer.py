@@ -1,10 +1,16 @@
 """
 Article categorizer module for grouping articles by subject.
 """
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from collections import defaultdict
+from operator import attrgetter, itemgetter
 import logging
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -20,6 +26,14 @@ class ArticleCategorizer:
             categories: Dictionary mapping category names to keyword lists
         """
         self.categories = categories
+        self.automaton = self._build_automaton(categories)
+        
+        # Lowercased keywords per category, used when no automaton is available
+        self._compiled = [
+            (category_name, tuple(keyword.lower() for keyword in category_info['keywords']))
+            for category_name, category_info in categories.items()
+            if category_info.get('keywords')
+        ]
         
     def categorize_articles(self, articles: List) -> Dict[str, List]:
         """
@@ -33,51 +47,89 @@ class ArticleCategorizer:
         """
         categorized = defaultdict(list)
         
-        for article in articles:
-            # Combine title and summary for keyword matching
-            text = f"{article.title} {article.summary}".lower()
-            
-            # Find matching categories
-            matched_categories = []
-            for category_name, category_info in self.categories.items():
-                keywords = category_info.get('keywords', [])
-                if keywords and self._matches_keywords(text, keywords):
-                    matched_categories.append(category_name)
-            
-            # If no category matched, assign to default category
-            if not matched_categories:
-                matched_categories = ["Software Engineering & Systems"]
-            
-            # Add article to all matched categories
-            for category in matched_categories:
-                categorized[category].append(article)
+        # Sort once by date (newest first); appending keeps each category sorted
+        articles = sorted(articles, key=attrgetter('published'), reverse=True)
         
-        # Sort articles within each category by date (newest first)
-        for category in categorized:
-            categorized[category].sort(
-                key=lambda x: x.published if x.published else datetime.min,
-                reverse=True
-            )
+        for article in articles:
+            # Assign each article to a single best-matching category so it
+            # is rendered only once in the digest
+            category = self.best_category(article.search_text)
+            categorized[category].append(article)
         
         # Log categorization results
         for category, articles in categorized.items():
-            logger.info(f"Category '{category}': {len(articles)} articles")
+            logger.info("Category '%s': %d articles", category, len(articles))
             
         return dict(categorized)
     
-    def _matches_keywords(self, text: str, keywords: List[str]) -> bool:
+    def best_category(self, text: str) -> str:
         """
-        Check if text matches any of the keywords.
+        Pick the category with the most matching keywords.
         
         Args:
             text: Text to search (should be lowercase)
-            keywords: List of keywords to search for
             
         Returns:
-            True if any keyword is found in text
+            Best-scoring category name, the earliest configured category on
+            ties, or the default category if nothing matched
         """
-        return any(keyword.lower() in text for keyword in keywords)
-
-
-# Import datetime for sorting
-from datetime import datetime
+        scores = self.score_categories(text)
+        if not scores:
+            return "Software Engineering & Systems"
+        return max(scores, key=itemgetter(1))[0]
+    
+    def score_categories(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Count the distinct keywords of each category found in the text.
+        
+        Args:
+            text: Text to search (should be lowercase)
+            
+        Returns:
+            List of (category name, keyword hits) for categories with at
+            least one hit, in configuration order
+        """
+        if self.automaton is None:
+            scores = []
+            for category_name, keywords in self._compiled:
+                hits = sum(keyword in text for keyword in keywords)
+                if hits:
+                    scores.append((category_name, hits))
+            return scores
+        
+        # Single pass over the text, regardless of the number of keywords
+        hits = defaultdict(int)
+        for keyword, category_names in {value for _, value in self.automaton.iter(text)}:
+            for category_name in category_names:
+                hits[category_name] += 1
+        return [(name, hits[name]) for name in self.categories if name in hits]
+    
+    def _build_automaton(self, categories: Dict):
+        """
+        Build an Aho-Corasick automaton over all category keywords.
+        
+        Args:
+            categories: Dictionary mapping category names to keyword lists
+            
+        Returns:
+            Automaton mapping each lowercased keyword to its categories,
+            or None if pyahocorasick is unavailable or there are no keywords
+        """
+        if ahocorasick is None:
+            logger.warning("pyahocorasick package not installed. Run: pip install pyahocorasick")
+            return None
+        
+        # The same keyword may be listed under several categories
+        keyword_categories = defaultdict(list)
+        for category_name, category_info in categories.items():
+            for keyword in category_info.get('keywords', []):
+                keyword_categories[keyword.lower()].append(category_name)
+        
+        if not keyword_categories:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, category_names in keyword_categories.items():
+            automaton.add_word(keyword, (keyword, tuple(category_names)))
+        automaton.make_automaton()
+        return automaton
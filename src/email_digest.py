@@ -1,11 +1,12 @@
 """
 Email digest generator and sender module.
 """
+import atexit
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Dict, List
+from email.message import EmailMessage
+from typing import Dict, List, Optional
 from datetime import datetime
+from html import escape
 import logging
 import os
 
@@ -14,6 +15,16 @@ from subscriber import Subscriber
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Per-article block of the HTML digest; fields must be HTML-escaped by the caller.
+# Styling lives in the digest's <style> block to keep each block small.
+ARTICLE_HTML_TEMPLATE = (
+    '<div class="article">'
+    '<div class="article-title"><a href="{link}" target="_blank">{title}</a></div>'
+    '<div class="article-meta"><strong>{source}</strong>{published}</div>'
+    '<div class="article-summary">{summary}</div>'
+    '</div>\n'
+)
+
 
 class EmailDigest:
     """Generates and sends email digests of blog articles."""
@@ -34,6 +45,7 @@ class EmailDigest:
         self.smtp_port = email_config['email']['smtp_port']
         self.subject_template = email_config['email']['subject_template']
         self.use_html = email_config['email'].get('use_html', True)
+        self.include_text = email_config['email'].get('include_text', True)
         
         # Get credentials from environment variables
         self.sender_email = os.getenv('SENDER_EMAIL')
@@ -41,6 +53,10 @@ class EmailDigest:
         
         # Initialize database connection
         self.db = Subscriber()
+        
+        # Authenticated SMTP connection, kept open across send_digest calls
+        self._smtp: Optional[smtplib.SMTP] = None
+        atexit.register(self.close)
     
     def get_recipients(self) -> List[str]:
         """
@@ -63,18 +79,24 @@ class EmailDigest:
         return recipients
         
     def generate_html_digest(self, categorized_articles: Dict[str, List],
-                            week_start: str) -> str:
+                            week_start: str,
+                            published_dates: Optional[Dict[int, str]] = None) -> str:
         """
         Generate HTML email digest.
         
         Args:
             categorized_articles: Dictionary mapping categories to article lists
             week_start: Week start date string
+            published_dates: Optional formatted publication dates keyed by
+                article id, as returned by _preformat_dates
             
         Returns:
             HTML string
         """
-        html = f"""
+        if published_dates is None:
+            published_dates = self._preformat_dates(categorized_articles)
+        
+        parts = [f"""
         <html>
         <head>
             <style>
@@ -132,6 +154,45 @@ class EmailDigest:
                     font-size: 14px;
                     text-align: center;
                 }}
+                .footer hr {{
+                    border: none;
+                    border-top: 2px solid #ddd;
+                    margin: 30px 0 20px 0;
+                }}
+                .footer h3 {{
+                    color: #2c3e50;
+                    margin-bottom: 10px;
+                }}
+                .footer p {{
+                    margin: 5px 0;
+                }}
+                .footer-section {{
+                    margin-bottom: 20px;
+                }}
+                .blog-sources {{
+                    margin-top: 10px;
+                    padding-left: 20px;
+                }}
+                .blog-sources li {{
+                    margin: 5px 0;
+                }}
+                .blog-sources a {{
+                    color: #2980b9;
+                    text-decoration: none;
+                }}
+                .footer .disclaimer {{
+                    font-size: 13px;
+                    color: #666;
+                }}
+                .footer-notes {{
+                    margin-top: 20px;
+                    padding-top: 15px;
+                    border-top: 1px solid #ddd;
+                }}
+                .footer-notes p {{
+                    font-size: 13px;
+                    color: #999;
+                }}
                 .stats {{
                     background-color: #e8f4f8;
                     padding: 15px;
@@ -147,7 +208,7 @@ class EmailDigest:
                 Total Articles: {sum(len(articles) for articles in categorized_articles.values())}<br>
                 Categories: {len([c for c in categorized_articles.keys() if categorized_articles[c]])}
             </div>
-        """
+        """]
         
         # Sort categories to put "Other" last
         sorted_categories = sorted(
@@ -160,54 +221,51 @@ class EmailDigest:
             if not articles:
                 continue
                 
-            html += f"\n            <h2>📚 {category} ({len(articles)} articles)</h2>\n"
+            parts.append(f"\n            <h2>📚 {escape(category)} ({len(articles)} articles)</h2>\n")
             
             for article in articles:
-                published_str = ""
-                if article.published:
-                    published_str = article.published.strftime("%B %d, %Y")
-                
-                html += f"""
-            <div class="article">
-                <div class="article-title">
-                    <a href="{article.link}" target="_blank">{article.title}</a>
-                </div>
-                <div class="article-meta">
-                    <strong>{article.source}</strong>{' • ' + published_str if published_str else ''}
-                </div>
-                <div class="article-summary">
-                    {article.summary}
-                </div>
-            </div>
-                """
+                published_str = published_dates[id(article)]
+                parts.append(ARTICLE_HTML_TEMPLATE.format(
+                    link=escape(article.link),
+                    title=escape(article.title),
+                    source=escape(article.source),
+                    published=' • ' + published_str if published_str else '',
+                    summary=escape(article.summary)
+                ))
         
         # Generate footer
-        html += self._generate_html_footer()
+        parts.append(self._generate_html_footer())
         
-        html += """
+        parts.append("""
         </body>
         </html>
-        """
+        """)
         
-        return html
+        return "".join(parts)
     
     def generate_text_digest(self, categorized_articles: Dict[str, List],
-                            week_start: str) -> str:
+                            week_start: str,
+                            published_dates: Optional[Dict[int, str]] = None) -> str:
         """
         Generate plain text email digest.
         
         Args:
             categorized_articles: Dictionary mapping categories to article lists
             week_start: Week start date string
+            published_dates: Optional formatted publication dates keyed by
+                article id, as returned by _preformat_dates
             
         Returns:
             Plain text string
         """
-        text = f"Weekly AI/ML Blog Digest - Week of {week_start}\n"
-        text += "=" * 60 + "\n\n"
+        if published_dates is None:
+            published_dates = self._preformat_dates(categorized_articles)
+        
+        parts = [f"Weekly AI/ML Blog Digest - Week of {week_start}\n"]
+        parts.append("=" * 60 + "\n\n")
         
         total_articles = sum(len(articles) for articles in categorized_articles.values())
-        text += f"Total Articles: {total_articles}\n\n"
+        parts.append(f"Total Articles: {total_articles}\n\n")
         
         # Sort categories to put "Other" last
         sorted_categories = sorted(
@@ -220,23 +278,24 @@ class EmailDigest:
             if not articles:
                 continue
                 
-            text += f"\n{category.upper()} ({len(articles)} articles)\n"
-            text += "-" * 60 + "\n\n"
+            parts.append(f"\n{category.upper()} ({len(articles)} articles)\n")
+            parts.append("-" * 60 + "\n\n")
             
             for article in articles:
-                text += f"• {article.title}\n"
-                text += f"  Source: {article.source}\n"
-                if article.published:
-                    text += f"  Date: {article.published.strftime('%B %d, %Y')}\n"
-                text += f"  Link: {article.link}\n"
+                parts.append(f"• {article.title}\n")
+                parts.append(f"  Source: {article.source}\n")
+                published_str = published_dates[id(article)]
+                if published_str:
+                    parts.append(f"  Date: {published_str}\n")
+                parts.append(f"  Link: {article.link}\n")
                 if article.summary:
-                    text += f"  Summary: {article.summary}\n"
-                text += "\n"
+                    parts.append(f"  Summary: {article.summary}\n")
+                parts.append("\n")
         
         # Add footer
-        text += self._generate_text_footer()
+        parts.append(self._generate_text_footer())
         
-        return text
+        return "".join(parts)
     
     def send_digest(self, categorized_articles: Dict[str, List]) -> bool:
         """
@@ -263,29 +322,39 @@ class EmailDigest:
         week_start = datetime.now().strftime("%B %d, %Y")
         
         # Create message
-        msg = MIMEMultipart('alternative')
+        msg = EmailMessage()
         msg['From'] = self.sender_email
         msg['To'] = self.sender_email  # Send to self, use BCC for recipients
         msg['Bcc'] = ', '.join(recipients)  # BCC hides recipients from each other
         msg['Subject'] = self.subject_template.format(date=week_start)
         
         # Generate digest content
-        text_content = self.generate_text_digest(categorized_articles, week_start)
-        text_part = MIMEText(text_content, 'plain')
-        msg.attach(text_part)
+        published_dates = self._preformat_dates(categorized_articles)
         
-        if self.use_html:
-            html_content = self.generate_html_digest(categorized_articles, week_start)
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
+        # Plain text is always sent if there is no HTML part
+        if self.include_text or not self.use_html:
+            text_content = self.generate_text_digest(
+                categorized_articles, week_start, published_dates
+            )
+            msg.set_content(text_content)
         
-        # Send email
+        if self.use_html:
+            html_content = self.generate_html_digest(
+                categorized_articles, week_start, published_dates
+            )
+            if self.include_text:
+                msg.add_alternative(html_content, subtype='html')
+            else:
+                msg.set_content(html_content, subtype='html')
+        
+        # Send email, reconnecting once if the cached connection was dropped
         try:
-            logger.info(f"Connecting to SMTP server {self.smtp_server}:{self.smtp_port}...")
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.email_password)
-                server.send_message(msg)
+            try:
+                self._get_smtp().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                logger.info("SMTP connection lost, reconnecting...")
+                self.close()
+                self._get_smtp().send_message(msg)
             
             logger.info(f"Email digest sent successfully to {len(recipients)} recipients")
             return True
@@ -294,6 +363,63 @@ class EmailDigest:
             logger.error(f"Error sending email: {str(e)}")
             return False
     
+    def close(self):
+        """Close the cached SMTP connection, if any."""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        finally:
+            self._smtp = None
+    
+    def _get_smtp(self) -> smtplib.SMTP:
+        """
+        Get an authenticated SMTP connection, reusing the cached one if alive.
+        
+        Returns:
+            Logged-in SMTP connection
+        """
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+        
+        logger.info(f"Connecting to SMTP server {self.smtp_server}:{self.smtp_port}...")
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            server.starttls()
+            server.login(self.sender_email, self.email_password)
+        except Exception:
+            server.close()
+            raise
+        
+        self._smtp = server
+        return server
+    
+    def _preformat_dates(self, categorized_articles: Dict[str, List]) -> Dict[int, str]:
+        """
+        Format each article's publication date once for all digest formats.
+        
+        Args:
+            categorized_articles: Dictionary mapping categories to article lists
+            
+        Returns:
+            Dictionary mapping article id to formatted date ("" if unknown)
+        """
+        published_dates = {}
+        for articles in categorized_articles.values():
+            for article in articles:
+                if id(article) not in published_dates:
+                    published_dates[id(article)] = (
+                        article.published.strftime("%B %d, %Y") if article.published else ""
+                    )
+        return published_dates
+    
     def _generate_html_footer(self) -> str:
         """
         Generate HTML footer with author info, disclaimer, and blog sources.
@@ -303,63 +429,59 @@ class EmailDigest:
         """
         footer_info = self.footer_config['footer']
         
-        html = """
+        parts = ["""
             <div class="footer">
-                <hr style="border: none; border-top: 2px solid #ddd; margin: 30px 0 20px 0;">
+                <hr>
                 
-                <div style="margin-bottom: 20px;">
-                    <h3 style="color: #2c3e50; margin-bottom: 10px;">📝 About This Digest</h3>
-                    <p style="margin: 5px 0;">{}</p>
+                <div class="footer-section">
+                    <h3>📝 About This Digest</h3>
+                    <p>{}</p>
                 </div>
                 
-                <div style="margin-bottom: 20px;">
-                    <h3 style="color: #2c3e50; margin-bottom: 10px;">👤 Author</h3>
-                    <p style="margin: 5px 0;"><strong>{}</strong></p>
-                    <p style="margin: 5px 0;">Contact: <a href="mailto:{}">{}</a></p>
+                <div class="footer-section">
+                    <h3>👤 Author</h3>
+                    <p><strong>{}</strong></p>
+                    <p>Contact: <a href="mailto:{}">{}</a></p>
                 </div>
                 
-                <div style="margin-bottom: 20px;">
-                    <h3 style="color: #2c3e50; margin-bottom: 10px;">📚 Blog Sources</h3>
-                    <p style="margin: 5px 0;">This digest aggregates content from the following sources:</p>
-                    <ul style="margin-top: 10px; padding-left: 20px;">
+                <div class="footer-section">
+                    <h3>📚 Blog Sources</h3>
+                    <p>This digest aggregates content from the following sources:</p>
+                    <ul class="blog-sources">
         """.format(
             footer_info['description'].strip(),
             footer_info['author']['name'],
             footer_info['author']['email'],
             footer_info['author']['email']
-        )
+        )]
         
         # Add blog sources
         for blog in self.blogs_config['blogs']:
-            html += f"""
-                        <li style="margin: 5px 0;">
-                            <a href="{blog['url']}" target="_blank" style="color: #2980b9; text-decoration: none;">
-                                {blog['name']}
-                            </a>
-                        </li>
-            """
-        
-        html += """
+            parts.append(
+                f'<li><a href="{blog["url"]}" target="_blank">{blog["name"]}</a></li>\n'
+            )
+        
+        parts.append("""
                     </ul>
                 </div>
                 
-                <div style="margin-bottom: 20px;">
-                    <h3 style="color: #2c3e50; margin-bottom: 10px;">⚖️ Disclaimer</h3>
-                    <p style="margin: 5px 0; font-size: 13px; color: #666;">{}</p>
+                <div class="footer-section">
+                    <h3>⚖️ Disclaimer</h3>
+                    <p class="disclaimer">{}</p>
                 </div>
                 
-                <div style="margin-top: 20px; padding-top: 15px; border-top: 1px solid #ddd;">
-                    <p style="font-size: 13px; color: #999; margin: 5px 0;">{}</p>
-                    <p style="font-size: 13px; color: #999; margin: 5px 0;">{}</p>
+                <div class="footer-notes">
+                    <p>{}</p>
+                    <p>{}</p>
                 </div>
             </div>
         """.format(
             footer_info['disclaimer'].strip(),
             footer_info['contact_info'].strip(),
             footer_info['unsubscribe_note'].strip()
-        )
+        ))
         
-        return html
+        return "".join(parts)
     
     def _generate_text_footer(self) -> str:
         """
@@ -370,29 +492,29 @@ class EmailDigest:
         """
         footer_info = self.footer_config['footer']
         
-        text = "\n" + "=" * 60 + "\n"
-        text += "ABOUT THIS DIGEST\n"
-        text += "=" * 60 + "\n"
-        text += footer_info['description'].strip() + "\n\n"
+        parts = ["\n" + "=" * 60 + "\n"]
+        parts.append("ABOUT THIS DIGEST\n")
+        parts.append("=" * 60 + "\n")
+        parts.append(footer_info['description'].strip() + "\n\n")
         
-        text += "AUTHOR\n"
-        text += "-" * 60 + "\n"
-        text += f"Name: {footer_info['author']['name']}\n"
-        text += f"Contact: {footer_info['author']['email']}\n\n"
+        parts.append("AUTHOR\n")
+        parts.append("-" * 60 + "\n")
+        parts.append(f"Name: {footer_info['author']['name']}\n")
+        parts.append(f"Contact: {footer_info['author']['email']}\n\n")
         
-        text += "BLOG SOURCES\n"
-        text += "-" * 60 + "\n"
-        text += "This digest aggregates content from:\n\n"
+        parts.append("BLOG SOURCES\n")
+        parts.append("-" * 60 + "\n")
+        parts.append("This digest aggregates content from:\n\n")
         for blog in self.blogs_config['blogs']:
-            text += f"  • {blog['name']}\n"
-            text += f"    {blog['url']}\n\n"
+            parts.append(f"  • {blog['name']}\n")
+            parts.append(f"    {blog['url']}\n\n")
         
-        text += "DISCLAIMER\n"
-        text += "-" * 60 + "\n"
-        text += footer_info['disclaimer'].strip() + "\n\n"
+        parts.append("DISCLAIMER\n")
+        parts.append("-" * 60 + "\n")
+        parts.append(footer_info['disclaimer'].strip() + "\n\n")
         
-        text += "=" * 60 + "\n"
-        text += footer_info['contact_info'].strip() + "\n"
-        text += footer_info['unsubscribe_note'].strip() + "\n"
+        parts.append("=" * 60 + "\n")
+        parts.append(footer_info['contact_info'].strip() + "\n")
+        parts.append(footer_info['unsubscribe_note'].strip() + "\n")
         
-        return text
+        return "".join(parts)
@@ -1,22 +1,60 @@
 """
 LLM-based article categorizer using OpenRouter or GitHub Models API.
 """
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+import hashlib
 import logging
 import os
 import json
+import sqlite3
 
 from categorizer import ArticleCategorizer
-from utils import load_config, get_config_path
+from utils import load_config, get_config_path, get_cache_path
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _extract_json_array(text: str) -> Optional[List[str]]:
+    """
+    Decode the first JSON array of strings in an LLM response.
+    
+    Decoding starts at each '[' in turn, so surrounding prose, markdown
+    fences or a wrapping object are skipped, and brackets inside strings
+    are handled by the JSON decoder itself. Arrays holding anything but
+    strings, and empty ones, are skipped too, so a bracketed "[3]" or "[]"
+    in prose isn't mistaken for the answer.
+    
+    Args:
+        text: Raw response text
+        
+    Returns:
+        The decoded list, or None if the text contains no array of strings
+    """
+    start = text.find('[')
+    while start != -1:
+        try:
+            value, _ = _JSON_DECODER.raw_decode(text, start)
+        except (ValueError, RecursionError):
+            # Not JSON here (or nested too deeply); try the next bracket
+            value = None
+        if value and isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return value
+        start = text.find('[', start + 1)
+    return None
+
 
 class LLMCategorizer:
     """Categorizes articles using LLM via OpenRouter or GitHub Models API."""
     
+    # Keyword fallback shared by all instances
+    _keyword_categorizer: Optional[ArticleCategorizer] = None
+    
     def __init__(self, config: Dict):
         """
         Initialize the LLM categorizer.
@@ -29,23 +67,41 @@ class LLMCategorizer:
         self.provider = self.llm_config.get('provider', 'openrouter')
         self.model = self.llm_config.get('model', 'openai/gpt-4o-mini')
         self.batch_size = self.llm_config.get('batch_size', 10)
+        self.max_concurrent = self.llm_config.get('max_concurrent', 4)
         self.max_tokens = self.llm_config.get('max_tokens', 500)
         self.temperature = self.llm_config.get('temperature', 0.3)
         self.fallback_to_keywords = self.llm_config.get('fallback_to_keywords', True)
         
         self.categories = config.get('categories', [])
+        self.category_names = {cat['name'] for cat in self.categories}
         
-        # Load keyword categories from categories.yaml for fallback
-        keyword_config = load_config(get_config_path('categories.yaml'))
-        self.keyword_categories = keyword_config.get('categories', {})
+        # Category list shown in the prompt; its hash is part of every cache
+        # key so editing the categories invalidates earlier answers
+        self.category_list = "\n".join([
+            f"{i+1}. {cat['name']}: {cat['description']}"
+            for i, cat in enumerate(self.categories)
+        ])
+        self.category_list_hash = hashlib.blake2b(
+            self.category_list.encode('utf-8'), digest_size=8
+        ).hexdigest()
         
-        # Initialize keyword categorizer for fallback
-        self.keyword_categorizer = ArticleCategorizer(self.keyword_categories)
+        # Load keyword categories from categories.yaml and initialize the
+        # keyword categorizer for fallback, once per process
+        if LLMCategorizer._keyword_categorizer is None:
+            keyword_config = load_config(get_config_path('categories.yaml'))
+            LLMCategorizer._keyword_categorizer = ArticleCategorizer(
+                keyword_config.get('categories', {})
+            )
+        self.keyword_categorizer = LLMCategorizer._keyword_categorizer
+        self.keyword_categories = self.keyword_categorizer.categories
         
         # Initialize API client
         self.client = None
         self._init_client()
         
+        # Categories from earlier runs, keyed by a hash of the prompt inputs
+        self.cache = self._open_cache()
+        
     def _init_client(self):
         """Initialize LLM client based on provider."""
         try:
@@ -117,42 +173,126 @@ class LLMCategorizer:
         """
         categorized = defaultdict(list)
         
-        # Process articles in batches
-        for i in range(0, len(articles), self.batch_size):
-            batch = articles[i:i + self.batch_size]
-            logger.info(f"Processing batch {i//self.batch_size + 1} ({len(batch)} articles)")
-            
-            try:
-                batch_results = self._categorize_batch(batch)
+        # Sort once by date (newest first); appending keeps each category sorted
+        articles = sorted(articles, key=attrgetter('published'), reverse=True)
+        
+        # Reuse categories cached by earlier runs; only send new articles
+        keys = [self._cache_key(article) for article in articles]
+        categories = [self._cache_get(key) for key in keys]
+        pending = [i for i, category in enumerate(categories) if category is None]
+        if len(pending) < len(articles):
+            logger.info("Using cached categories for %d articles", len(articles) - len(pending))
+        
+        # Process articles in batches; each batch is an independent API call,
+        # so dispatch them concurrently and collect results in batch order
+        batches = [
+            pending[i:i + self.batch_size]
+            for i in range(0, len(pending), self.batch_size)
+        ]
+        if batches:
+            max_workers = min(self.max_concurrent, len(batches))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                batch_results = executor.map(
+                    self._process_batch,
+                    range(1, len(batches) + 1),
+                    [[articles[i] for i in batch] for batch in batches]
+                )
                 
-                # Add results to categorized dict
-                for article, category in zip(batch, batch_results):
-                    if category:
-                        categorized[category].append(article)
-                        
-            except Exception as e:
-                logger.error(f"Error processing batch: {str(e)}")
-                # Try individual articles in this batch with keyword fallback
-                for article in batch:
-                    category = self._categorize_single_with_keywords(article)
-                    if category:
-                        categorized[category].append(article)
-        
-        # Sort articles within each category by date
-        from datetime import datetime
-        for category in categorized:
-            categorized[category].sort(
-                key=lambda x: x.published if x.published else datetime.min,
-                reverse=True
-            )
+                for batch, results in zip(batches, batch_results):
+                    if results is None:
+                        # Try individual articles in this batch with keyword fallback
+                        for i in batch:
+                            categories[i] = self._categorize_single_with_keywords(articles[i])
+                        continue
+                    
+                    # A padded or truncated answer may be shifted against the
+                    # articles, so use it for this digest but don't cache it
+                    batch_categories, complete = results
+                    for i, category in zip(batch, batch_categories):
+                        categories[i] = category
+                        if complete:
+                            self._cache_set(keys[i], category)
+            
+            if self.cache is not None:
+                self.cache.commit()
+        
+        # Add results to categorized dict
+        for article, category in zip(articles, categories):
+            if category:
+                categorized[category].append(article)
         
         # Log results
         for category, arts in categorized.items():
-            logger.info(f"Category '{category}': {len(arts)} articles")
+            logger.info("Category '%s': %d articles", category, len(arts))
         
         return dict(categorized)
     
-    def _categorize_batch(self, articles: List) -> List[str]:
+    def _process_batch(self, batch_number: int,
+                       batch: List) -> Optional[Tuple[List[str], bool]]:
+        """
+        Categorize one batch with the LLM.
+        
+        Args:
+            batch_number: 1-based batch index, for logging
+            batch: List of Article objects
+            
+        Returns:
+            Tuple of category names (one per article) and whether they can be
+            cached (see _call_llm_api), or None if the batch failed
+        """
+        logger.info("Processing batch %d (%d articles)", batch_number, len(batch))
+        
+        try:
+            return self._categorize_batch(batch)
+        except Exception as e:
+            logger.error(f"Error processing batch: {str(e)}")
+            return None
+    
+    def _open_cache(self) -> Optional[sqlite3.Connection]:
+        """Open the on-disk cache of LLM categories from earlier runs."""
+        if not self.llm_config.get('cache', True):
+            return None
+        
+        cache_path = get_cache_path('llm_categories.sqlite3')
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache = sqlite3.connect(str(cache_path))
+            cache.execute(
+                "CREATE TABLE IF NOT EXISTS categories "
+                "(key TEXT PRIMARY KEY, category TEXT NOT NULL)"
+            )
+            return cache
+        except sqlite3.Error as e:
+            logger.warning(f"Could not open LLM cache at {cache_path}: {str(e)}")
+            return None
+    
+    def _cache_key(self, article) -> str:
+        """Hash the model, the category list and the article fields sent in the prompt."""
+        content = (
+            f"{self.model}|{self.category_list_hash}|"
+            f"{article.title}|{article.summary[:200]}"
+        )
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Get a cached category, or None if not cached."""
+        if self.cache is None:
+            return None
+        row = self.cache.execute(
+            "SELECT category FROM categories WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def _cache_set(self, key: str, category: str):
+        """Store a category returned by the LLM, if it is a configured one."""
+        if self.cache is None or category not in self.category_names:
+            return
+        self.cache.execute(
+            "INSERT OR REPLACE INTO categories (key, category) VALUES (?, ?)",
+            (key, category)
+        )
+    
+    def _categorize_batch(self, articles: List) -> Tuple[List[str], bool]:
         """
         Categorize a batch of articles using LLM.
         
@@ -160,14 +300,9 @@ class LLMCategorizer:
             articles: List of Article objects
             
         Returns:
-            List of category names (one per article)
+            Tuple of category names (one per article) and whether the LLM
+            returned exactly one category per article
         """
-        # Create category list for prompt
-        category_list = "\n".join([
-            f"{i+1}. {cat['name']}: {cat['description']}"
-            for i, cat in enumerate(self.categories)
-        ])
-        
         # Create articles summary for prompt
         articles_text = ""
         for i, article in enumerate(articles):
@@ -179,7 +314,7 @@ class LLMCategorizer:
         # Create prompt
         prompt = f"""Categorize the following technical blog articles into ONE of these categories:
 
-{category_list}
+{self.category_list}
 
 Articles to categorize:
 {articles_text}
@@ -193,9 +328,18 @@ If an article doesn't clearly fit any category, use "Software Engineering & Syst
         # Call API based on provider
         return self._call_llm_api(prompt, len(articles))
     
-    def _call_llm_api(self, prompt: str, expected_count: int) -> List[str]:
-        """Call LLM API (OpenRouter or GitHub Models)."""
-        response = self.client.chat.completions.create(
+    def _call_llm_api(self, prompt: str, expected_count: int) -> Tuple[List[str], bool]:
+        """
+        Call LLM API (OpenRouter or GitHub Models).
+        
+        Returns:
+            Tuple of exactly expected_count category names and whether the
+            response had that many; when it didn't, the list is padded or
+            truncated and its categories may be misaligned with the articles
+        """
+        # Only the message text is needed, so read the raw JSON body instead
+        # of having the SDK build and validate its response model
+        raw_response = self.client.chat.completions.with_raw_response.create(
             model=self.model,
             messages=[
                 {"role": "system", "content": "You are a technical article categorization assistant. Always respond with valid JSON."},
@@ -205,51 +349,24 @@ If an article doesn't clearly fit any category, use "Software Engineering & Syst
             max_tokens=self.max_tokens
         )
         
-        result = response.choices[0].message.content
-        # Parse JSON response
-        try:
-            # Clean markdown code blocks if present (some models wrap JSON in ```json```)
-            cleaned_result = result.strip()
-            if cleaned_result.startswith('```'):
-                # Remove markdown code block markers
-                lines = cleaned_result.split('\n')
-                # Remove first line (```json or ```)
-                lines = lines[1:]
-                # Remove last line if it's just ```
-                if lines and lines[-1].strip() == '```':
-                    lines = lines[:-1]
-                cleaned_result = '\n'.join(lines).strip()
-            
-            data = json.loads(cleaned_result)
-            # Handle different possible response formats
-            if isinstance(data, list):
-                categories = data
-            elif 'categories' in data:
-                categories = data['categories']
-            elif 'results' in data:
-                categories = data['results']
-            else:
-                # Take the first list found in the dict
-                categories = next(v for v in data.values() if isinstance(v, list))
-            
-            # Validate we got the right number of results
-            if len(categories) != expected_count:
-                logger.warning(f"Expected {expected_count} categories, got {len(categories)}")
-                # Pad or truncate
-                categories = (categories + ["Software Engineering & Systems"] * expected_count)[:expected_count]
-            
-            return categories
-        except (json.JSONDecodeError, StopIteration) as e:
+        response = json.loads(raw_response.content)
+        result = response['choices'][0]['message']['content'] or ""
+        # Extract the JSON array, skipping markdown fences or a wrapping object
+        # (some models return ```json [...] ``` or {"categories": [...]})
+        categories = _extract_json_array(result)
+        if categories is None:
             logger.error(f"Failed to parse LLM response: {result}")
-            raise
+            raise ValueError("No JSON array of category names in LLM response")
+        
+        # Validate we got the right number of results
+        complete = len(categories) == expected_count
+        if not complete:
+            logger.warning(f"Expected {expected_count} categories, got {len(categories)}")
+            # Pad or truncate
+            categories = (categories + ["Software Engineering & Systems"] * expected_count)[:expected_count]
+        
+        return categories, complete
     
     def _categorize_single_with_keywords(self, article) -> str:
         """Get category for single article using keywords."""
-        text = f"{article.title} {article.summary}".lower()
-        
-        for category_name, category_info in self.keyword_categories.items():
-            keywords = category_info.get('keywords', [])
-            if any(keyword.lower() in text for keyword in keywords):
-                return category_name
-        
-        return "Software Engineering & Systems"
+        return self.keyword_categorizer.best_category(article.search_text)
@@ -4,13 +4,14 @@ Main script to orchestrate the weekly blog digest generation and email sending.
 """
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from scraper import BlogScraper
 from categorizer import ArticleCategorizer
 from llm_categorizer import LLMCategorizer
 from email_digest import EmailDigest
-from utils import load_config, get_config_path
+from utils import load_config, get_config_path, get_cache_path
 
 logging.basicConfig(
     level=logging.INFO,
@@ -31,23 +32,25 @@ def main(days_back: int = 7, send_email: bool = True, use_llm: bool = True):
     try:
         logger.info("Starting blog digest generation...")
         
-        # Load configurations
-        logger.info("Loading configuration files...")
-        blogs_config = load_config(get_config_path('blogs.yaml'))
-        email_config = load_config(get_config_path('email_config.yaml'))
-        footer_config = load_config(get_config_path('footer_config.yaml'))
-        
         # Load appropriate categorization config
         if use_llm:
             logger.info("Using LLM-based categorization")
-            categories_config = load_config(get_config_path('llm_categories.yaml'))
+            categories_file = 'llm_categories.yaml'
         else:
             logger.info("Using keyword-based categorization")
-            categories_config = load_config(get_config_path('categories.yaml'))
+            categories_file = 'categories.yaml'
+        
+        # Load configurations in parallel
+        logger.info("Loading configuration files...")
+        config_files = ['blogs.yaml', 'email_config.yaml', 'footer_config.yaml', categories_file]
+        with ThreadPoolExecutor(max_workers=len(config_files)) as executor:
+            blogs_config, email_config, footer_config, categories_config = executor.map(
+                lambda filename: load_config(get_config_path(filename)), config_files
+            )
         
         # Step 1: Fetch articles from blogs
         logger.info(f"Fetching articles from the last {days_back} days...")
-        scraper = BlogScraper(blogs_config['blogs'])
+        scraper = BlogScraper(blogs_config['blogs'], cache_path=get_cache_path('feeds.json'))
         articles = scraper.fetch_articles(days_back=days_back)
         
         if not articles:
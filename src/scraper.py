@@ -2,35 +2,149 @@
 Blog scraper module for fetching articles from RSS feeds.
 """
 import feedparser
-from datetime import datetime, timedelta
-from typing import List, Dict
+import html
+import json
+import os
+import re
+import requests
+import sys
+from requests.adapters import HTTPAdapter
+from lxml import etree, html as lxml_html
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Iterator, Optional, Tuple
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a feed server before giving up on that blog
+REQUEST_TIMEOUT = 30
 
+# Same preference order feedparser sends when it fetches feeds itself
+FEED_ACCEPT_HEADER = (
+    'application/atom+xml,application/rdf+xml,application/rss+xml,'
+    'application/xml;q=0.9,text/xml;q=0.2,*/*;q=0.1'
+)
+
+# Patterns used to clean feed summaries
+_HTML_TAG_RE = re.compile(r'<.*?>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Dublin Core date element, used by some RSS feeds in place of pubDate
+_DC_DATE_TAG = '{http://purl.org/dc/elements/1.1/}date'
+
+# Full post body; Medium feeds carry it instead of a description
+_CONTENT_ENCODED_TAG = '{http://purl.org/rss/1.0/modules/content/}encoded'
+
+
+@lru_cache(maxsize=4096)
+def _time_fields_to_datetime(time_fields: tuple) -> datetime:
+    """
+    Build a datetime from (year, month, day, hour, minute, second).
+    
+    Cached because entries in a feed often share timestamps.
+    """
+    return datetime(*time_fields)
+
+
+def _feed_date_to_datetime(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an RFC 822 or ISO 8601 feed date into a naive UTC datetime.
+    
+    Naive UTC matches the dates feedparser produces, so articles from both
+    parsers compare against the same cutoff.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _new_links(articles: List['Article'], seen_links: set) -> Iterator['Article']:
+    """
+    Yield the articles whose links haven't been seen yet, recording them.
+    
+    The same post can be listed more than once (e.g. in two feeds); this
+    keeps only the first copy of each link. Articles without a link are
+    always kept.
+    """
+    for article in articles:
+        if article.link:
+            if article.link in seen_links:
+                continue
+            seen_links.add(article.link)
+        yield article
+
+
+@dataclass(slots=True, eq=False)
 class Article:
-    """Represents a blog article."""
+    """
+    Represents a blog article.
+    
+    ``published`` is always set; the scraper falls back to the fetch time
+    when a feed entry has no date, so articles can be sorted on it directly.
+    """
+    
+    title: str
+    link: str
+    published: datetime
+    summary: str
+    source: str
+    _search_text: Optional[str] = field(default=None, init=False, repr=False)
+    _published_iso: Optional[str] = field(default=None, init=False, repr=False)
+        
+    @property
+    def search_text(self) -> str:
+        """Lowercased title and summary, computed once for keyword matching."""
+        if self._search_text is None:
+            self._search_text = f"{self.title} {self.summary}".lower()
+        return self._search_text
     
-    def __init__(self, title: str, link: str, published: datetime, 
-                 summary: str, source: str):
-        self.title = title
-        self.link = link
-        self.published = published
-        self.summary = summary
-        self.source = source
+    @property
+    def published_iso(self) -> Optional[str]:
+        """ISO 8601 form of ``published``, computed once for serialization."""
+        if self._published_iso is None and self.published:
+            self._published_iso = self.published.isoformat()
+        return self._published_iso
         
     def to_dict(self) -> Dict:
         """Convert article to dictionary."""
         return {
             'title': self.title,
             'link': self.link,
-            'published': self.published.isoformat() if self.published else None,
+            'published': self.published_iso,
             'summary': self.summary,
             'source': self.source
         }
     
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Article':
+        """Create article from a dictionary produced by to_dict."""
+        published = data.get('published')
+        article = cls(
+            title=data['title'],
+            link=data['link'],
+            published=datetime.fromisoformat(published) if published else None,
+            summary=data['summary'],
+            source=data['source']
+        )
+        article._published_iso = published
+        return article
+    
     def __repr__(self):
         return f"Article(title='{self.title}', source='{self.source}')"
 
@@ -38,40 +152,117 @@ class Article:
 class BlogScraper:
     """Scrapes articles from tech blog RSS feeds."""
     
-    def __init__(self, blogs: List[Dict]):
+    def __init__(self, blogs: List[Dict], max_workers: int = 16,
+                 cache_path: Optional[Path] = None):
         """
         Initialize the blog scraper.
         
         Args:
             blogs: List of blog configurations with name, url, and rss_feed
+            max_workers: Maximum number of feeds to fetch concurrently
+            cache_path: Optional JSON file for caching feeds between runs;
+                unchanged feeds are then revalidated with a conditional GET
         """
         self.blogs = blogs
+        self.max_workers = max_workers
+        self.cache_path = cache_path
+        self._feed_cache: Dict[str, Dict] = {}
+        
+        # Shared HTTP session: pooled keep-alive connections, gzip, timeouts
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': feedparser.USER_AGENT,
+            'Accept': FEED_ACCEPT_HEADER
+        })
+        adapter = HTTPAdapter(pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         
     def fetch_articles(self, days_back: int = 7) -> List[Article]:
         """
         Fetch articles from all configured blogs.
         
+        When the same post is listed by two blogs, the copy from the blog
+        listed first in the config is kept, whichever feed finished first.
+        
         Args:
             days_back: Number of days to look back for articles
             
         Returns:
-            List of Article objects
+            List of Article objects, grouped by blog in config order
         """
-        cutoff_date = datetime.now() - timedelta(days=days_back)
+        blog_articles: List[List[Article]] = [[] for _ in self.blogs]
+        for index, articles in self._iter_blog_articles(days_back):
+            blog_articles[index] = articles
+        
         all_articles = []
+        seen_links = set()
+        for articles in blog_articles:
+            all_articles.extend(_new_links(articles, seen_links))
         
-        for blog in self.blogs:
-            logger.info(f"Fetching articles from {blog['name']}...")
-            try:
-                articles = self._fetch_blog_articles(blog, cutoff_date)
-                all_articles.extend(articles)
-                logger.info(f"Found {len(articles)} articles from {blog['name']}")
-            except Exception as e:
-                logger.error(f"Error fetching from {blog['name']}: {str(e)}")
-                
         logger.info(f"Total articles fetched: {len(all_articles)}")
         return all_articles
     
+    def stream_articles(self, days_back: int = 7) -> Iterator[Article]:
+        """
+        Yield articles from all configured blogs as each feed finishes.
+        
+        Feeds are fetched concurrently, so callers can start working on the
+        first blog's articles while slower feeds are still downloading. When
+        the same post is listed by two blogs, the copy from whichever feed
+        finishes first is kept; use fetch_articles for a stable choice.
+        
+        Args:
+            days_back: Number of days to look back for articles
+            
+        Yields:
+            Article objects, grouped by blog in order of completion
+        """
+        seen_links = set()
+        for _, articles in self._iter_blog_articles(days_back):
+            yield from _new_links(articles, seen_links)
+    
+    def _iter_blog_articles(self, days_back: int) -> Iterator[Tuple[int, List[Article]]]:
+        """
+        Fetch all blogs concurrently, yielding each one's articles as it finishes.
+        
+        Args:
+            days_back: Number of days to look back for articles
+            
+        Yields:
+            Tuples of the blog's index in the config and its articles, in
+            order of completion; blogs whose fetch failed are skipped
+        """
+        if not self.blogs:
+            return
+        
+        cutoff_date = datetime.now() - timedelta(days=days_back)
+        self._feed_cache = self._load_feed_cache()
+        
+        try:
+            # Feeds are fetched over the network, so fetch them concurrently
+            max_workers = min(self.max_workers, len(self.blogs))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {}
+                for index, blog in enumerate(self.blogs):
+                    logger.info(f"Fetching articles from {blog['name']}...")
+                    futures[executor.submit(self._fetch_blog_articles, blog, cutoff_date)] = index
+                
+                for future in as_completed(futures):
+                    index = futures[future]
+                    blog = self.blogs[index]
+                    try:
+                        articles = future.result()
+                    except Exception as e:
+                        logger.error(f"Error fetching from {blog['name']}: {str(e)}")
+                        continue
+                    
+                    logger.info(f"Found {len(articles)} articles from {blog['name']}")
+                    yield index, articles
+        finally:
+            # Runs once every fetch has finished, even if the caller stops early
+            self._save_feed_cache()
+    
     def _fetch_blog_articles(self, blog: Dict, cutoff_date: datetime) -> List[Article]:
         """
         Fetch articles from a single blog's RSS feed.
@@ -84,61 +275,247 @@ class BlogScraper:
             List of Article objects
         """
         articles = []
+        # Every article from this feed shares one interned source string
+        source = sys.intern(blog['name'])
+        
+        # Revalidate the cached copy, unless it was filtered with a later
+        # cutoff and so may be missing articles in the requested window
+        cached = self._feed_cache.get(blog['rss_feed'])
+        if cached and datetime.fromisoformat(cached['cutoff']) > cutoff_date:
+            cached = None
+        
+        request_headers = {}
+        if cached and cached.get('etag'):
+            request_headers['If-None-Match'] = cached['etag']
+        if cached and cached.get('modified'):
+            request_headers['If-Modified-Since'] = cached['modified']
         
         try:
-            feed = feedparser.parse(blog['rss_feed'])
+            response = self.session.get(
+                blog['rss_feed'], headers=request_headers, timeout=REQUEST_TIMEOUT
+            )
             
-            for entry in feed.entries:
-                # Parse publication date
-                published = self._parse_date(entry)
-                
-                # Skip articles older than cutoff date
-                if published and published < cutoff_date:
-                    continue
-                
-                # Extract article information
-                title = entry.get('title', 'No Title')
-                link = entry.get('link', '')
-                summary = entry.get('summary', entry.get('description', ''))
-                
-                # Clean HTML tags from summary if present
-                summary = self._clean_html(summary)
-                
-                article = Article(
-                    title=title,
-                    link=link,
-                    published=published,
-                    summary=summary,
-                    source=blog['name']
+            if cached and response.status_code == 304:
+                logger.info(f"Feed for {blog['name']} not modified, using cached articles")
+                for data in cached['articles']:
+                    article = Article.from_dict(data)
+                    if article.published >= cutoff_date:
+                        article.source = source
+                        articles.append(article)
+                return articles
+            
+            response.raise_for_status()
+            
+            # Most feeds list entries newest first; blogs that don't can set
+            # assume_sorted: false to have every entry checked
+            assume_sorted = blog.get('assume_sorted', True)
+            
+            # Feeds marked as RSS in the config skip feedparser's format
+            # detection, unless the document turns out not to be RSS 2.0
+            rss_articles = None
+            if blog.get('type') == 'rss':
+                rss_articles = self._parse_rss(
+                    response.content, cutoff_date, source, assume_sorted
                 )
-                articles.append(article)
+                if rss_articles is None:
+                    logger.info(f"Feed for {blog['name']} is not plain RSS 2.0, using feedparser")
+            if rss_articles is not None:
+                articles = rss_articles
+            else:
+                articles = self._parse_feed(response, cutoff_date, source, assume_sorted)
+            
+            etag = response.headers.get('ETag')
+            modified = response.headers.get('Last-Modified')
+            if self.cache_path and (etag or modified):
+                self._feed_cache[blog['rss_feed']] = {
+                    'etag': etag,
+                    'modified': modified,
+                    'cutoff': cutoff_date.isoformat(),
+                    'articles': [article.to_dict() for article in articles]
+                }
                 
         except Exception as e:
-            logger.error(f"Error parsing feed for {blog['name']}: {str(e)}")
+            logger.error(f"Error fetching feed for {blog['name']}: {str(e)}")
+            
+        return articles
+    
+    def _parse_feed(self, response: requests.Response, cutoff_date: datetime,
+                    source: str, assume_sorted: bool = False) -> List[Article]:
+        """
+        Parse a feed of any format with feedparser.
+        
+        Args:
+            response: Successful HTTP response containing the feed
+            cutoff_date: Only keep articles published after this date
+            source: Blog name to attach to each article
+            assume_sorted: Stop at the first entry older than the cutoff,
+                for feeds listed newest first
+            
+        Returns:
+            List of Article objects
+        """
+        # Summaries are reduced to plain text by _clean_html and the digest
+        # escapes everything it renders, so skip feedparser's HTML
+        # sanitizer and relative-URI rewriting
+        feed = feedparser.parse(
+            response.content,
+            response_headers={
+                'content-type': response.headers.get('Content-Type', ''),
+                'content-location': response.url
+            },
+            sanitize_html=False,
+            resolve_relative_uris=False
+        )
+        
+        articles = []
+        for entry in feed.entries:
+            # Parse publication date
+            published = self._parse_date(entry)
+            
+            # Skip articles older than cutoff date; in a newest-first feed
+            # every later entry is older too
+            if published and published < cutoff_date:
+                if assume_sorted:
+                    break
+                continue
             
+            # Extract article information
+            title = entry.get('title', 'No Title')
+            link = entry.get('link', '')
+            summary = entry.get('summary', entry.get('description', ''))
+            
+            # Clean HTML tags from summary if present
+            summary = self._clean_html(summary)
+            
+            article = Article(
+                title=title,
+                link=link,
+                published=published,
+                summary=summary,
+                source=source
+            )
+            articles.append(article)
+        
         return articles
     
+    def _parse_rss(self, content: bytes, cutoff_date: datetime, source: str,
+                   assume_sorted: bool = False) -> Optional[List[Article]]:
+        """
+        Parse an RSS 2.0 feed directly with lxml.
+        
+        Args:
+            content: Raw feed document
+            cutoff_date: Only keep articles published after this date
+            source: Blog name to attach to each article
+            assume_sorted: Stop at the first entry older than the cutoff,
+                for feeds listed newest first
+            
+        Returns:
+            List of Article objects, or None if the document is not
+            well-formed RSS 2.0 and should go through feedparser instead
+        """
+        # lxml parsers must not be shared between the fetch threads; this one
+        # also never resolves external entities or fetches DTDs
+        parser = etree.XMLParser(resolve_entities=False, no_network=True)
+        try:
+            root = etree.fromstring(content, parser=parser)
+        except (etree.XMLSyntaxError, ValueError):
+            return None
+        if root is None or root.tag != 'rss':
+            return None
+        
+        articles = []
+        for item in root.iterfind('channel/item'):
+            published = (
+                _feed_date_to_datetime(item.findtext('pubDate'))
+                or _feed_date_to_datetime(item.findtext(_DC_DATE_TAG))
+                or datetime.now()
+            )
+            
+            # Skip articles older than cutoff date; in a newest-first feed
+            # every later entry is older too
+            if published < cutoff_date:
+                if assume_sorted:
+                    break
+                continue
+            
+            title = (item.findtext('title') or '').strip() or 'No Title'
+            link = (item.findtext('link') or '').strip()
+            # Like feedparser, use the full content when there is no description
+            summary = self._clean_html(
+                item.findtext('description') or item.findtext(_CONTENT_ENCODED_TAG) or ''
+            )
+            
+            articles.append(Article(
+                title=title,
+                link=link,
+                published=published,
+                summary=summary,
+                source=source
+            ))
+        
+        return articles
+    
+    def _load_feed_cache(self) -> Dict[str, Dict]:
+        """Load cached feed validators and articles, keyed by feed URL."""
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable feed cache {self.cache_path}: {str(e)}")
+            return {}
+    
+    def _save_feed_cache(self):
+        """Write the feed cache, replacing the previous file atomically."""
+        if not self.cache_path:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix('.tmp')
+            # json.dumps encodes in one shot with the C encoder, whereas
+            # json.dump streams chunks through the pure-Python one
+            payload = json.dumps(self._feed_cache, separators=(',', ':'))
+            with open(tmp_path, 'w') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write feed cache {self.cache_path}: {str(e)}")
+    
     def _parse_date(self, entry) -> datetime:
         """Parse publication date from feed entry."""
         # Try different date fields
-        for date_field in ['published_parsed', 'updated_parsed', 'created_parsed']:
-            if hasattr(entry, date_field):
-                time_struct = getattr(entry, date_field)
-                if time_struct:
-                    try:
-                        return datetime(*time_struct[:6])
-                    except:
-                        pass
+        for date_field in ('published_parsed', 'updated_parsed', 'created_parsed'):
+            time_struct = getattr(entry, date_field, None)
+            if time_struct:
+                try:
+                    return _time_fields_to_datetime(tuple(time_struct[:6]))
+                except (TypeError, ValueError):
+                    pass
+        
+        # feedparser leaves the *_parsed fields empty when none of its date
+        # handlers recognise a string; retry the raw values as RFC 822 or ISO
+        for date_field in ('published', 'updated', 'created'):
+            published = _feed_date_to_datetime(getattr(entry, date_field, None))
+            if published:
+                return published
         
         # If no date found, use current time
         return datetime.now()
     
     def _clean_html(self, text: str) -> str:
         """Remove HTML tags from text."""
-        import re
-        # Remove HTML tags
-        clean = re.compile('<.*?>')
-        text = re.sub(clean, '', text)
+        if not text:
+            return ''
+        
+        # Extract text with libxml2, which also decodes entities; the HTML
+        # digest escapes text when rendering
+        try:
+            text = lxml_html.fragment_fromstring(text, create_parent='div').text_content()
+        except (etree.ParserError, ValueError):
+            # Fall back to stripping tags with a regex
+            text = html.unescape(_HTML_TAG_RE.sub('', text))
         # Remove extra whitespace
-        text = ' '.join(text.split())
+        text = _WHITESPACE_RE.sub(' ', text).strip()
         return text[:300]  # Limit summary length
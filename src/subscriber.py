@@ -3,12 +3,29 @@ Database utilities for Supabase subscriber management.
 """
 import os
 import logging
+from functools import lru_cache
 from typing import List, Optional
 from supabase import create_client, Client
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows requested per round trip when listing subscribers
+SUBSCRIBER_PAGE_SIZE = 1000
+
+
+@lru_cache(maxsize=None)
+def _get_client(supabase_url: str, supabase_key: str) -> Client:
+    """
+    Create a Supabase client once per URL and key.
+    
+    Sharing the client lets every Subscriber in the process reuse the same
+    HTTP connection pool instead of setting up new connections.
+    """
+    client = create_client(supabase_url, supabase_key)
+    logger.info("Supabase client initialized successfully")
+    return client
+
 
 class Subscriber:
     """Manages subscriber data in Supabase."""
@@ -21,8 +38,7 @@ class Subscriber:
         
         if self.supabase_url and self.supabase_key:
             try:
-                self.client = create_client(self.supabase_url, self.supabase_key)
-                logger.info("Supabase client initialized successfully")
+                self.client = _get_client(self.supabase_url, self.supabase_key)
             except Exception as e:
                 logger.error(f"Failed to initialize Supabase client: {str(e)}")
         else:
@@ -40,12 +56,23 @@ class Subscriber:
             return []
         
         try:
-            response = self.client.table('subscribers')\
-                .select('email')\
-                .eq('is_active', True)\
-                .execute()
+            # Fetch in fixed-size pages; ordering keeps pages stable, and an
+            # index on (is_active, email) lets Postgres serve them from the index
+            emails = []
+            start = 0
+            while True:
+                response = self.client.table('subscribers')\
+                    .select('email')\
+                    .eq('is_active', True)\
+                    .order('email')\
+                    .range(start, start + SUBSCRIBER_PAGE_SIZE - 1)\
+                    .execute()
+                
+                emails.extend(row['email'] for row in response.data)
+                if len(response.data) < SUBSCRIBER_PAGE_SIZE:
+                    break
+                start += SUBSCRIBER_PAGE_SIZE
             
-            emails = [row['email'] for row in response.data]
             logger.info(f"Retrieved {len(emails)} active subscribers from database")
             return emails
             
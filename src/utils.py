@@ -2,24 +2,60 @@
 Utility functions for loading configuration files.
 """
 import yaml
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from types import MappingProxyType
+from typing import Any, Mapping
 
+# Prefer the libyaml-backed loader; fall back to pure Python if unavailable
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
-def load_config(config_path: str) -> Dict:
+
+def load_config(config_path: str) -> Mapping:
     """
     Load YAML configuration file.
     
+    Files are parsed once per process; later calls with the same path
+    return the same read-only mapping.
+    
     Args:
         config_path: Path to YAML config file
         
     Returns:
-        Dictionary with configuration
+        Read-only mapping with configuration
+    """
+    return _load_config_cached(str(config_path))
+
+
+@lru_cache(maxsize=32)
+def _load_config_cached(config_path: str) -> Mapping:
+    """Parse a YAML config file; cached by load_config."""
+    # libyaml reads the raw bytes itself, so skip Python-side decoding
+    with open(config_path, 'rb') as f:
+        config = yaml.load(f, Loader=SafeLoader)
+    
+    # The parsed config is shared between callers, so don't let them modify it
+    return _freeze(config)
+
+
+def _freeze(value: Any) -> Any:
+    """
+    Recursively make parsed YAML read-only.
+    
+    Mappings become read-only mapping proxies and lists become tuples,
+    which are also smaller since they carry no spare capacity.
     """
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
 
 
+@lru_cache(maxsize=32)
 def get_config_path(filename: str) -> Path:
     """
     Get full path to config file.
@@ -33,3 +69,17 @@ def get_config_path(filename: str) -> Path:
     # Get project root directory (parent of src)
     project_root = Path(__file__).parent.parent
     return project_root / 'config' / filename
+
+
+def get_cache_path(filename: str) -> Path:
+    """
+    Get full path to a file in the local cache directory.
+    
+    Args:
+        filename: Name of cache file
+        
+    Returns:
+        Path object
+    """
+    project_root = Path(__file__).parent.parent
+    return project_root / '.cache' / filename